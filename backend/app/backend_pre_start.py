@@ -1,7 +1,9 @@
+import asyncio
 import logging
 
-from sqlalchemy import Engine
-from sqlmodel import Session, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
 
 from app.core.db import engine
@@ -19,11 +21,11 @@ wait_seconds = 1
     before=before_log(logger, logging.INFO),
     after=after_log(logger, logging.WARN),
 )
-def init(db_engine: Engine) -> None:
+async def init(db_engine: AsyncEngine) -> None:
     try:
-        with Session(db_engine) as session:
+        async with AsyncSession(db_engine) as session:
             # Try to create session to check if DB is awake
-            session.exec(select(1))
+            await session.exec(select(1))
     except Exception as e:
         logger.error(e)
         raise e
@@ -31,7 +33,7 @@ def init(db_engine: Engine) -> None:
 
 def main() -> None:
     logger.info("Initializing service")
-    init(engine)
+    asyncio.run(init(engine))
     logger.info("Service finished initializing")
 
 
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+from typing import Any
+
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+redis_client: Redis | None = (
+    Redis.from_url(str(settings.REDIS_URL)) if settings.REDIS_URL else None
+)
+
+# Short-lived per-process copy of generation-tagged entries, so hot reads skip
+# the Redis round trip. A generation bump makes entries unreachable here too, so
+# no cross-worker eviction is needed.
+_local_cache: TTLCache[str, bytes] = TTLCache(
+    maxsize=settings.LOCAL_CACHE_MAX_SIZE, ttl=settings.LOCAL_CACHE_EXPIRE_SECONDS
+)
+
+
+# Every cache key embeds the current generation of its table. Writes bump the
+# generation with a single INCR, so stale entries are never read again and
+# simply expire, instead of having to be found and deleted.
+#
+# The cache fails open: Redis errors are logged and treated as a miss. When the
+# generation can't be read it is None, the key helpers return None, and reads
+# and writes skip the cache entirely rather than guess a generation.
+def _generation_key(model: type[SQLModel]) -> str:
+    return f"gen:{model.__name__}"
+
+
+async def get_generation(model: type[SQLModel]) -> int | None:
+    if redis_client is None:
+        return None
+    try:
+        generation = await redis_client.get(_generation_key(model))
+    except RedisError as e:
+        logger.warning("Failed to read cache generation of %s: %s", model.__name__, e)
+        return None
+    return int(generation or 0)
+
+
+async def bump_generation(model: type[SQLModel]) -> bool:
+    if redis_client is None:
+        return True
+    try:
+        await redis_client.incr(_generation_key(model))
+    except RedisError as e:
+        # The write itself is committed; cached entries for the model may be
+        # served until they expire
+        logger.error("Failed to bump cache generation of %s: %s", model.__name__, e)
+        return False
+    return True
+
+
+class CacheUnavailableError(Exception):
+    """Cached entries that must not be served stale could not be invalidated."""
+
+
+async def invalidate_entities(model: type[SQLModel], *ids: Any) -> None:
+    # For entries that must never outlive a write to an existing row (cached
+    # logins), failing open is not enough: if the generation can't be bumped,
+    # delete the entries of `ids` under the current generation, and raise if
+    # that fails too
+    if redis_client is None or await bump_generation(model):
+        return
+    generation = await get_generation(model)
+    if generation is not None:
+        keys = [_entity_key(model, id, generation) for id in ids]
+        try:
+            await redis_client.delete(*keys)
+            return
+        except RedisError as e:
+            logger.error("Failed to delete cache keys %s: %s", keys, e)
+    raise CacheUnavailableError(f"Could not invalidate cached {model.__name__}")
+
+
+def _entity_key(model: type[SQLModel], id: Any, generation: int) -> str:
+    return f"entity:{model.__name__}:{id}:{generation}"
+
+
+def entity_key(model: type[SQLModel], id: Any, generation: int | None) -> str | None:
+    if generation is None:
+        return None
+    return _entity_key(model, id, generation)
+
+
+def query_key(
+    model: type[SQLModel], generation: int | None, *params: Any
+) -> str | None:
+    if generation is None:
+        return None
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()
+    return f"query:{model.__name__}:{digest}:{generation}"
+
+
+async def get_value(key: str | None, *, local: bool = False) -> bytes | None:
+    if redis_client is None or key is None:
+        return None
+    if local:
+        # A single lookup: the entry may expire between `in` and `[]`
+        local_value = _local_cache.get(key)
+        if local_value is not None:
+            return local_value
+    try:
+        value: bytes | None = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning("Failed to read cache key %s: %s", key, e)
+        return None
+    if local and value is not None:
+        _local_cache[key] = value
+    return value
+
+
+async def set_value(
+    key: str | None,
+    value: str,
+    expire_seconds: int = settings.CACHE_EXPIRE_SECONDS,
+    *,
+    local: bool = False,
+) -> None:
+    if redis_client is None or key is None:
+        return
+    try:
+        await redis_client.set(key, value, ex=expire_seconds)
+    except RedisError as e:
+        logger.warning("Failed to write cache key %s: %s", key, e)
+        return
+    if local:
+        _local_cache[key] = value.encode()
+
+
+async def close() -> None:
+    if redis_client is not None:
+        await redis_client.aclose()
@@ -7,10 +7,11 @@ from pydantic import (
     BeforeValidator,
     HttpUrl,
     PostgresDsn,
+    RedisDsn,
     computed_field,
     model_validator,
 )
-from pydantic_core import MultiHostUrl
+from pydantic_core import MultiHostUrl, Url
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing_extensions import Self
 
@@ -55,12 +56,16 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Per worker process; with the default 4 workers this stays under Postgres'
+    # default max_connections of 100
+    POSTGRES_POOL_SIZE: int = 20
+    POSTGRES_MAX_OVERFLOW: int = 0
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
         return MultiHostUrl.build(
-            scheme="postgresql+psycopg",
+            scheme="postgresql+asyncpg",
             username=self.POSTGRES_USER,
             password=self.POSTGRES_PASSWORD,
             host=self.POSTGRES_SERVER,
@@ -68,6 +73,22 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    REDIS_SERVER: str | None = None
+    REDIS_PORT: int = 6379
+    CACHE_EXPIRE_SECONDS: int = 60 * 60
+    USER_CACHE_EXPIRE_SECONDS: int = 60 * 5
+    LOCAL_CACHE_EXPIRE_SECONDS: int = 5
+    LOCAL_CACHE_MAX_SIZE: int = 10_000
+    # Per worker process, next to the 4 uvicorn workers of the Docker image
+    PASSWORD_HASH_WORKERS: int = 2
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def REDIS_URL(self) -> RedisDsn | None:
+        if not self.REDIS_SERVER:
+            return None
+        return Url.build(scheme="redis", host=self.REDIS_SERVER, port=self.REDIS_PORT)
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
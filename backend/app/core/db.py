@@ -1,10 +1,39 @@
-from sqlmodel import Session, create_engine, select
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    pool_recycle=30 * 60,
+    pool_pre_ping=True,
+    # asyncpg prepares each distinct statement once per connection and reuses it,
+    # skipping Postgres' parse/plan step on the hot single-row lookups
+    connect_args={"prepared_statement_cache_size": 500},
+)
+# Shares the pool with `engine`; reads on it skip the BEGIN/COMMIT round trips.
+read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+
+async def warm_up_pool() -> None:
+    # Open the whole pool up front so the first requests after startup don't pay
+    # for TCP connects and authentication; the connections go straight back
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.POSTGRES_POOL_SIZE)),
+        return_exceptions=True,
+    )
+    connections = [r for r in results if isinstance(r, AsyncConnection)]
+    await asyncio.gather(*(connection.close() for connection in connections))
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -12,17 +41,18 @@ engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
 
 
-def init_db(session: Session) -> None:
+async def init_db(session: AsyncSession) -> None:
     # Tables should be created with Alembic migrations
     # But if you don't want to use migrations, create
     # the tables un-commenting the next lines
     # from sqlmodel import SQLModel
 
     # This works because the models are already imported and registered from app.models
-    # SQLModel.metadata.create_all(engine)
+    # async with engine.begin() as conn:
+    #     await conn.run_sync(SQLModel.metadata.create_all)
 
-    user = session.exec(
-        select(User).where(User.email == settings.FIRST_SUPERUSER)
+    user = (
+        await session.exec(select(User).where(User.email == settings.FIRST_SUPERUSER))
     ).first()
     if not user:
         user_in = UserCreate(
@@ -30,4 +60,4 @@ def init_db(session: Session) -> None:
             password=settings.FIRST_SUPERUSER_PASSWORD,
             is_superuser=True,
         )
-        user = crud.create_user(session=session, user_create=user_in)
+        user = await crud.create_user(session=session, user_create=user_in)
@@ -1,3 +1,6 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -8,6 +11,15 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow; hashing in a worker process keeps the event loop
+# free to serve other requests while a login or password change is in flight.
+# Workers come from a forkserver, as forking the already threaded server process
+# could deadlock the child.
+_hash_pool = ProcessPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    mp_context=multiprocessing.get_context("forkserver"),
+)
+
 
 ALGORITHM = "HS256"
 
@@ -25,3 +37,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_pool, verify_password, plain_password, hashed_password
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, get_password_hash, password)
+
+
+def shutdown_hash_pool() -> None:
+    _hash_pool.shutdown()
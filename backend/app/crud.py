@@ -1,54 +1,296 @@
+import json
 import uuid
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import bindparam, insert
+from sqlalchemy.orm import raiseload, selectinload
+from sqlmodel import col, delete, func, literal, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core import cache
+from app.core.config import settings
+from app.core.security import aget_password_hash, averify_password
+from app.models import Item, ItemCreate, ItemUpdate, User, UserCreate, UserUpdate
 
+# Statements on hot paths are built once at import and executed with bound
+# parameters, instead of rebuilding the expression tree on every call
+_GET_USER_BY_EMAIL = select(User).where(col(User.email) == bindparam("email"))
+_USER_EMAIL_EXISTS = (
+    select(literal(1))
+    .select_from(User)
+    .where(col(User.email) == bindparam("email"))
+    .limit(1)
+)
+_USER_EMAIL_EXISTS_FOR_OTHER = _USER_EMAIL_EXISTS.where(
+    col(User.id) != bindparam("user_id")
+)
+_COUNT_ITEMS = select(func.count()).select_from(Item)
+_COUNT_OWNER_ITEMS = _COUNT_ITEMS.where(col(Item.owner_id) == bindparam("owner_id"))
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+
+async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await aget_password_hash(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    statement = insert(User).values(db_obj.model_dump()).returning(User)
+    db_obj = (await session.exec(statement)).scalar_one()  # type: ignore
+    await session.commit()
+    await cache.bump_generation(User)
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+async def update_user(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
+    email = db_user.email
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        hashed_password = await aget_password_hash(password)
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await cache.invalidate_entities(User, email, db_user.email)
     return db_user
 
 
-def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
-    return session_user
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    result = await session.exec(_GET_USER_BY_EMAIL, params={"email": email})
+    return result.first()
+
 
+async def user_email_exists(
+    *, session: AsyncSession, email: str, exclude_user_id: uuid.UUID | None = None
+) -> bool:
+    if exclude_user_id is None:
+        result = await session.exec(_USER_EMAIL_EXISTS, params={"email": email})
+    else:
+        result = await session.exec(
+            _USER_EMAIL_EXISTS_FOR_OTHER,
+            params={"email": email, "user_id": exclude_user_id},
+        )
+    return result.first() is not None
 
-def authenticate(*, session: Session, email: str, password: str) -> User | None:
-    db_user = get_user_by_email(session=session, email=email)
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    # Logins only need the stored hash, so a short-lived copy of the row is
+    # served from the cache. It is detached from the session and must not be
+    # modified and added back. The generation is read before the row, so a copy
+    # read before a concurrent user write is stored under an already dead key.
+    generation = await cache.get_generation(User)
+    key = cache.entity_key(User, email, generation)
+    cached = await cache.get_value(key)
+    if cached is not None:
+        # Validate from attributes: sqlmodel looks up relationships on the
+        # input, and a dict's .items() method would clash with User.items
+        db_user: User | None = User.model_validate(
+            SimpleNamespace(**json.loads(cached)), from_attributes=True
+        )
+    else:
+        db_user = await get_user_by_email(session=session, email=email)
+        if db_user:
+            await cache.set_value(
+                key,
+                db_user.model_dump_json(),
+                expire_seconds=settings.USER_CACHE_EXPIRE_SECONDS,
+            )
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not await averify_password(password, db_user.hashed_password):
         return None
     return db_user
 
 
-def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
+async def create_item(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
-    session.add(db_item)
-    session.commit()
-    session.refresh(db_item)
+    statement = insert(Item).values(db_item.model_dump()).returning(Item)
+    db_item = (await session.exec(statement)).scalar_one()  # type: ignore
+    await session.commit()
+    await cache.bump_generation(Item)
+    return db_item
+
+
+async def create_items(
+    *, session: AsyncSession, items_in: list[ItemCreate], owner_id: uuid.UUID
+) -> list[Item]:
+    if not items_in:
+        return []
+    values = [
+        Item.model_validate(item_in, update={"owner_id": owner_id}).model_dump()
+        for item_in in items_in
+    ]
+    statement = insert(Item).returning(Item, sort_by_parameter_order=True)
+    result = await session.exec(statement, params=values)  # type: ignore
+    db_items: list[Item] = list(result.scalars())
+    await session.commit()
+    await cache.bump_generation(Item)
+    return db_items
+
+
+def _item_filters(
+    *, item_id: uuid.UUID | None = None, owner_id: uuid.UUID | None = None
+) -> list[Any]:
+    filters = []
+    if item_id is not None:
+        filters.append(col(Item.id) == item_id)
+    if owner_id is not None:
+        filters.append(col(Item.owner_id) == owner_id)
+    return filters
+
+
+async def update_item(
+    *,
+    session: AsyncSession,
+    item_id: uuid.UUID,
+    item_in: ItemUpdate,
+    owner_id: uuid.UUID | None = None,
+) -> Item | None:
+    filters = _item_filters(item_id=item_id, owner_id=owner_id)
+    item_data = item_in.model_dump(exclude_unset=True)
+    if not item_data:
+        return (await session.exec(select(Item).where(*filters))).first()
+    statement = update(Item).where(*filters).values(item_data).returning(Item)
+    result = await session.exec(statement)  # type: ignore
+    db_item: Item | None = result.scalar_one_or_none()
+    await session.commit()
+    if db_item:
+        await cache.bump_generation(Item)
+    return db_item
+
+
+async def delete_item(
+    *, session: AsyncSession, item_id: uuid.UUID, owner_id: uuid.UUID | None = None
+) -> bool:
+    statement = (
+        delete(Item)
+        .where(*_item_filters(item_id=item_id, owner_id=owner_id))
+        .returning(col(Item.id))
+    )
+    result = await session.exec(statement)  # type: ignore
+    deleted = result.first() is not None
+    await session.commit()
+    if deleted:
+        await cache.bump_generation(Item)
+    return deleted
+
+
+async def get_item(
+    *, session: AsyncSession, item_id: uuid.UUID, load: list[str] | None = None
+) -> Item | None:
+    # Relationships raise instead of lazy loading unless requested in `load`, so
+    # an accidental access can't turn into a hidden extra round trip. Eager
+    # loads bypass the cache, which only holds the item's own columns.
+    if load:
+        statement = (
+            select(Item)
+            .where(col(Item.id) == item_id)
+            .options(*(selectinload(getattr(Item, name)) for name in load))
+        )
+        return (await session.exec(statement)).first()
+    generation = await cache.get_generation(Item)
+    key = cache.entity_key(Item, item_id, generation)
+    cached = await cache.get_value(key, local=True)
+    if cached is not None:
+        return Item.model_validate(json.loads(cached))
+    db_item = await session.get(Item, item_id, options=[raiseload("*")])
+    if db_item:
+        await cache.set_value(key, db_item.model_dump_json(), local=True)
     return db_item
+
+
+async def iter_items(
+    *, session: AsyncSession, owner_id: uuid.UUID | None = None, chunk_size: int = 500
+) -> AsyncIterator[Item]:
+    """Yield items lazily through a server-side cursor, `chunk_size` rows at a time.
+
+    Nothing is buffered or cached, so callers should consume the iterator while
+    the session is open. An AUTOCOMMIT session is committed and stays in a
+    transaction afterwards.
+    """
+    statement = (
+        select(Item)
+        .where(*_item_filters(owner_id=owner_id))
+        .execution_options(yield_per=chunk_size)
+    )
+    bind_options = session.get_bind().get_execution_options()
+    if bind_options.get("isolation_level") == "AUTOCOMMIT":
+        # Server-side cursors need a transaction, which the AUTOCOMMIT sessions of
+        # GET requests don't have. Release the AUTOCOMMIT connection (the commit
+        # sends nothing to the server) and continue on a transactional one, so
+        # the session never holds two pooled connections at once.
+        connection = await session.connection()
+        isolation_level = connection.default_isolation_level
+        await session.commit()
+        await session.connection(execution_options={"isolation_level": isolation_level})
+    result = await session.stream_scalars(statement)
+    async for db_item in result:
+        yield db_item
+
+
+async def count_items(
+    *, session: AsyncSession, owner_id: uuid.UUID | None = None
+) -> int:
+    generation = await cache.get_generation(Item)
+    key = cache.query_key(Item, generation, "count", owner_id)
+    cached = await cache.get_value(key, local=True)
+    if cached is not None:
+        return int(cached)
+    if owner_id is None:
+        result = await session.exec(_COUNT_ITEMS)
+    else:
+        result = await session.exec(_COUNT_OWNER_ITEMS, params={"owner_id": owner_id})
+    count = result.one()
+    await cache.set_value(key, str(count), local=True)
+    return count
+
+
+async def get_items_page(
+    *,
+    session: AsyncSession,
+    owner_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> tuple[list[Item], int]:
+    generation = await cache.get_generation(Item)
+    key = cache.query_key(Item, generation, "page", owner_id, skip, limit)
+    cached = await cache.get_value(key, local=True)
+    if cached is not None:
+        page = json.loads(cached)
+        return [Item.model_validate(data) for data in page["data"]], page["count"]
+    # The window count is computed before OFFSET/LIMIT, so one round trip returns
+    # both the page and the total number of matching rows
+    statement = (
+        select(Item, func.count().over())
+        .where(*_item_filters(owner_id=owner_id))
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = (await session.exec(statement)).all()
+    db_items = [db_item for db_item, _ in rows]
+    if rows:
+        count = rows[0][1]
+    elif skip:
+        # Past the last page there is no row to carry the count
+        count = await count_items(session=session, owner_id=owner_id)
+    else:
+        count = 0
+    await cache.set_value(
+        key,
+        json.dumps(
+            {
+                "data": [db_item.model_dump(mode="json") for db_item in db_items],
+                "count": count,
+            }
+        ),
+        local=True,
+    )
+    return db_items, count
@@ -1,10 +1,17 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core import cache
 from app.core.config import settings
+from app.core.db import engine, warm_up_pool
+from app.core.security import shutdown_hash_pool
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,10 +21,21 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    await warm_up_pool()
+    yield
+    await engine.dispose()
+    await cache.close()
+    shutdown_hash_pool()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -30,4 +48,16 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+@app.exception_handler(cache.CacheUnavailableError)
+async def cache_unavailable_handler(
+    _request: Request, _exc: cache.CacheUnavailableError
+) -> JSONResponse:
+    # The write went through, but a stale login could still be accepted; ask the
+    # client to retry, which invalidates again
+    return JSONResponse(
+        status_code=503, content={"detail": "Service temporarily unavailable"}
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
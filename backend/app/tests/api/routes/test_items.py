@@ -1,17 +1,24 @@
 import uuid
 
-from fastapi.testclient import TestClient
-from sqlmodel import Session
+import pytest
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud
 from app.core.config import settings
+from app.models import ItemCreate
 from app.tests.utils.item import create_random_item
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
 
+pytestmark = pytest.mark.anyio
 
-def test_create_item(
-    client: TestClient, superuser_token_headers: dict[str, str]
+
+async def test_create_item(
+    client: AsyncClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"title": "Foo", "description": "Fighters"}
-    response = client.post(
+    response = await client.post(
         f"{settings.API_V1_STR}/items/",
         headers=superuser_token_headers,
         json=data,
@@ -24,11 +31,11 @@ def test_create_item(
     assert "owner_id" in content
 
 
-def test_read_item(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+async def test_read_item(
+    client: AsyncClient, superuser_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
-    response = client.get(
+    item = await create_random_item(db)
+    response = await client.get(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=superuser_token_headers,
     )
@@ -40,10 +47,10 @@ def test_read_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
-def test_read_item_not_found(
-    client: TestClient, superuser_token_headers: dict[str, str]
+async def test_read_item_not_found(
+    client: AsyncClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    response = client.get(
+    response = await client.get(
         f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
         headers=superuser_token_headers,
     )
@@ -52,11 +59,11 @@ def test_read_item_not_found(
     assert content["detail"] == "Item not found"
 
 
-def test_read_item_not_enough_permissions(
-    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+async def test_read_item_not_enough_permissions(
+    client: AsyncClient, normal_user_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
-    response = client.get(
+    item = await create_random_item(db)
+    response = await client.get(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=normal_user_token_headers,
     )
@@ -65,12 +72,13 @@ def test_read_item_not_enough_permissions(
     assert content["detail"] == "Not enough permissions"
 
 
-def test_read_items(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+async def test_read_items(
+    client: AsyncClient, superuser_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    create_random_item(db)
-    create_random_item(db)
-    response = client.get(
+    user = await create_random_user(db)
+    items_in = [ItemCreate(title=random_lower_string()) for _ in range(2)]
+    await crud.create_items(session=db, items_in=items_in, owner_id=user.id)
+    response = await client.get(
         f"{settings.API_V1_STR}/items/",
         headers=superuser_token_headers,
     )
@@ -79,12 +87,12 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
-def test_update_item(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+async def test_update_item(
+    client: AsyncClient, superuser_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
+    item = await create_random_item(db)
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
+    response = await client.put(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=superuser_token_headers,
         json=data,
@@ -97,11 +105,11 @@ def test_update_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
-def test_update_item_not_found(
-    client: TestClient, superuser_token_headers: dict[str, str]
+async def test_update_item_not_found(
+    client: AsyncClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
+    response = await client.put(
         f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
         headers=superuser_token_headers,
         json=data,
@@ -111,12 +119,12 @@ def test_update_item_not_found(
     assert content["detail"] == "Item not found"
 
 
-def test_update_item_not_enough_permissions(
-    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+async def test_update_item_not_enough_permissions(
+    client: AsyncClient, normal_user_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
+    item = await create_random_item(db)
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
+    response = await client.put(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=normal_user_token_headers,
         json=data,
@@ -126,11 +134,11 @@ def test_update_item_not_enough_permissions(
     assert content["detail"] == "Not enough permissions"
 
 
-def test_delete_item(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+async def test_delete_item(
+    client: AsyncClient, superuser_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
-    response = client.delete(
+    item = await create_random_item(db)
+    response = await client.delete(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=superuser_token_headers,
     )
@@ -139,10 +147,10 @@ def test_delete_item(
     assert content["message"] == "Item deleted successfully"
 
 
-def test_delete_item_not_found(
-    client: TestClient, superuser_token_headers: dict[str, str]
+async def test_delete_item_not_found(
+    client: AsyncClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    response = client.delete(
+    response = await client.delete(
         f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
         headers=superuser_token_headers,
     )
@@ -151,11 +159,11 @@ def test_delete_item_not_found(
     assert content["detail"] == "Item not found"
 
 
-def test_delete_item_not_enough_permissions(
-    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+async def test_delete_item_not_enough_permissions(
+    client: AsyncClient, normal_user_token_headers: dict[str, str], db: AsyncSession
 ) -> None:
-    item = create_random_item(db)
-    response = client.delete(
+    item = await create_random_item(db)
+    response = await client.delete(
         f"{settings.API_V1_STR}/items/{item.id}",
         headers=normal_user_token_headers,
     )
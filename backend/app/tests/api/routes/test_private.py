@@ -1,12 +1,16 @@
-from fastapi.testclient import TestClient
-from sqlmodel import Session, select
+import pytest
+from httpx import AsyncClient
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 from app.models import User
 
+pytestmark = pytest.mark.anyio
 
-def test_create_user(client: TestClient, db: Session) -> None:
-    r = client.post(
+
+async def test_create_user(client: AsyncClient, db: AsyncSession) -> None:
+    r = await client.post(
         f"{settings.API_V1_STR}/private/users/",
         json={
             "email": "pollo@listo.com",
@@ -19,7 +23,7 @@ def test_create_user(client: TestClient, db: Session) -> None:
 
     data = r.json()
 
-    user = db.exec(select(User).where(User.id == data["id"])).first()
+    user = (await db.exec(select(User).where(User.id == data["id"]))).first()
 
     assert user
     assert user.email == "pollo@listo.com"
@@ -0,0 +1,30 @@
+import uuid
+
+import pytest
+from starlette.requests import Request
+
+from app import crud
+from app.api.deps import get_db
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(method: str) -> Request:
+    return Request({"type": "http", "method": method, "headers": []})
+
+
+async def test_get_db_read_session_streams_items() -> None:
+    async for session in get_db(_request("GET")):
+        options = session.get_bind().get_execution_options()
+        assert options.get("isolation_level") == "AUTOCOMMIT"
+        items = [
+            item
+            async for item in crud.iter_items(session=session, owner_id=uuid.uuid4())
+        ]
+        assert items == []
+
+
+async def test_get_db_write_session_is_transactional() -> None:
+    async for session in get_db(_request("POST")):
+        options = session.get_bind().get_execution_options()
+        assert options.get("isolation_level") != "AUTOCOMMIT"
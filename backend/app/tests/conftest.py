@@ -1,42 +1,91 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 import pytest
-from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.deps import get_db
+from app.core import cache
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Item, User
+from app.models import Item
+from app.tests.utils.cache import FakeRedis, UnreachableRedis
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
 
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def connection() -> AsyncGenerator[AsyncConnection, None]:
+    # Everything the tests write happens inside this transaction and is thrown
+    # away with a single rollback, instead of deleting rows afterwards
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
+    await engine.dispose()
+
+
+def _session(connection: AsyncConnection) -> AsyncSession:
+    # commit() in the code under test only releases a SAVEPOINT
+    return AsyncSession(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+
+
 @pytest.fixture(scope="session", autouse=True)
-def db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        init_db(session)
+async def db(connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    async def get_test_db() -> AsyncGenerator[AsyncSession, None]:
+        async with _session(connection) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    async with _session(connection) as session:
+        await init_db(session)
         yield session
-        statement = delete(Item)
-        session.execute(statement)
-        statement = delete(User)
-        session.execute(statement)
-        session.commit()
+    app.dependency_overrides.clear()
+    await cache.bump_generation(Item)
 
 
 @pytest.fixture(scope="module")
-def client() -> Generator[TestClient, None, None]:
-    with TestClient(app) as c:
+async def client() -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
         yield c
 
 
 @pytest.fixture(scope="module")
-def superuser_token_headers(client: TestClient) -> dict[str, str]:
-    return get_superuser_token_headers(client)
+async def superuser_token_headers(client: AsyncClient) -> dict[str, str]:
+    return await get_superuser_token_headers(client)
 
 
 @pytest.fixture(scope="module")
-def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]:
-    return authentication_token_from_email(
+async def normal_user_token_headers(
+    client: AsyncClient, db: AsyncSession
+) -> dict[str, str]:
+    return await authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def redis_cache(monkeypatch: pytest.MonkeyPatch) -> Generator[FakeRedis, None, None]:
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", fake)
+    cache._local_cache.clear()
+    yield fake
+    cache._local_cache.clear()
+
+
+@pytest.fixture
+def unreachable_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "redis_client", UnreachableRedis())
@@ -0,0 +1,24 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core import db
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_warm_up_pool_closes_connections_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connection = MagicMock(spec=AsyncConnection)
+    engine = MagicMock()
+    engine.connect = AsyncMock(side_effect=[connection, ConnectionError(), connection])
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(settings, "POSTGRES_POOL_SIZE", 3)
+
+    with pytest.raises(ConnectionError):
+        await db.warm_up_pool()
+
+    assert connection.close.await_count == 2
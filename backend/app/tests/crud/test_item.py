@@ -0,0 +1,144 @@
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.models import Item, ItemCreate, ItemUpdate, User
+from app.tests.utils.cache import FakeRedis
+from app.tests.utils.item import create_random_item
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_items(db: AsyncSession) -> None:
+    user = await create_random_user(db)
+    items_in = [
+        ItemCreate(title=random_lower_string(), description=random_lower_string())
+        for _ in range(3)
+    ]
+    items = await crud.create_items(session=db, items_in=items_in, owner_id=user.id)
+    assert [item.title for item in items] == [item_in.title for item_in in items_in]
+    assert all(item.owner_id == user.id for item in items)
+    count_statement = (
+        select(func.count()).select_from(Item).where(Item.owner_id == user.id)
+    )
+    count = (await db.exec(count_statement)).one()
+    assert count == 3
+
+
+async def test_get_item_with_owner(db: AsyncSession) -> None:
+    item = await create_random_item(db)
+    db.expunge(item)
+    db_item = await crud.get_item(session=db, item_id=item.id, load=["owner"])
+    assert db_item
+    assert db_item.owner
+    assert db_item.owner.id == item.owner_id
+
+
+async def test_iter_items(db: AsyncSession) -> None:
+    user = await create_random_user(db)
+    items_in = [ItemCreate(title=random_lower_string()) for _ in range(3)]
+    items = await crud.create_items(session=db, items_in=items_in, owner_id=user.id)
+    streamed = [
+        item
+        async for item in crud.iter_items(session=db, owner_id=user.id, chunk_size=2)
+    ]
+    assert {item.id for item in streamed} == {item.id for item in items}
+
+
+async def test_get_items_page(db: AsyncSession) -> None:
+    user = await create_random_user(db)
+    items_in = [ItemCreate(title=random_lower_string()) for _ in range(3)]
+    await crud.create_items(session=db, items_in=items_in, owner_id=user.id)
+    items, count = await crud.get_items_page(
+        session=db, owner_id=user.id, skip=1, limit=1
+    )
+    assert len(items) == 1
+    assert count == 3
+    items, count = await crud.get_items_page(session=db, owner_id=user.id, skip=5)
+    assert items == []
+    assert count == 3
+
+
+async def test_get_item_cache_hit(db: AsyncSession, redis_cache: FakeRedis) -> None:
+    item = await create_random_item(db)
+    assert await crud.get_item(session=db, item_id=item.id) is item
+    cached_item = await crud.get_item(session=db, item_id=item.id)
+    assert cached_item is not item
+    assert isinstance(cached_item, Item)
+    assert isinstance(cached_item.id, uuid.UUID)
+    assert isinstance(cached_item.owner_id, uuid.UUID)
+    assert cached_item.model_dump() == item.model_dump()
+    assert any(key.startswith("entity:Item:") for key in redis_cache.data)
+
+
+@pytest.mark.usefixtures("redis_cache")
+async def test_get_item_cached_after_update_and_delete(db: AsyncSession) -> None:
+    item = await create_random_item(db)
+    await crud.get_item(session=db, item_id=item.id)
+    title = random_lower_string()
+    await crud.update_item(session=db, item_id=item.id, item_in=ItemUpdate(title=title))
+    db_item = await crud.get_item(session=db, item_id=item.id)
+    assert db_item
+    assert db_item.title == title
+    await crud.delete_item(session=db, item_id=item.id)
+    assert await crud.get_item(session=db, item_id=item.id) is None
+
+
+@pytest.mark.usefixtures("redis_cache")
+async def test_get_items_page_cached_after_update(db: AsyncSession) -> None:
+    item = await create_random_item(db)
+    items, count = await crud.get_items_page(session=db, owner_id=item.owner_id)
+    assert [db_item.title for db_item in items] == [item.title]
+    cached_items, _ = await crud.get_items_page(session=db, owner_id=item.owner_id)
+    assert isinstance(cached_items[0].id, uuid.UUID)
+    title = random_lower_string()
+    await crud.update_item(session=db, item_id=item.id, item_in=ItemUpdate(title=title))
+    items, count = await crud.get_items_page(session=db, owner_id=item.owner_id)
+    assert [db_item.title for db_item in items] == [title]
+    assert count == 1
+
+
+@pytest.mark.usefixtures("unreachable_redis")
+async def test_item_reads_and_writes_without_redis(db: AsyncSession) -> None:
+    item = await create_random_item(db)
+    assert await crud.get_item(session=db, item_id=item.id) is item
+    title = random_lower_string()
+    db_item = await crud.update_item(
+        session=db, item_id=item.id, item_in=ItemUpdate(title=title)
+    )
+    assert db_item
+    assert db_item.title == title
+    items, count = await crud.get_items_page(session=db, owner_id=item.owner_id)
+    assert [db_item.title for db_item in items] == [title]
+    assert count == 1
+
+
+async def test_iter_items_on_autocommit_session_reuses_connection() -> None:
+    # Mirrors a GET request: get_current_user has already used the connection
+    # before the route streams, and the pool has no room for a second one
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=1,
+    )
+    read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        async with AsyncSession(read_engine, expire_on_commit=False) as session:
+            await session.get(User, uuid.uuid4())
+            items = [
+                item
+                async for item in crud.iter_items(
+                    session=session, owner_id=uuid.uuid4()
+                )
+            ]
+            assert items == []
+    finally:
+        await engine.dispose()
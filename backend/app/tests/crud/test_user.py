@@ -1,91 +1,186 @@
+import uuid
+
+import pytest
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import Session
+from redis.exceptions import ConnectionError
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
+from app.core import cache
 from app.core.security import verify_password
 from app.models import User, UserCreate, UserUpdate
+from app.tests.utils.cache import FakeRedis, UnreachableRedis
 from app.tests.utils.utils import random_email, random_lower_string
 
+pytestmark = pytest.mark.anyio
+
 
-def test_create_user(db: Session) -> None:
+async def test_create_user(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=email, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     assert user.email == email
     assert hasattr(user, "hashed_password")
 
 
-def test_authenticate_user(db: Session) -> None:
+async def test_authenticate_user(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=email, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
-    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    user = await crud.create_user(session=db, user_create=user_in)
+    authenticated_user = await crud.authenticate(
+        session=db, email=email, password=password
+    )
     assert authenticated_user
     assert user.email == authenticated_user.email
 
 
-def test_not_authenticate_user(db: Session) -> None:
+async def test_not_authenticate_user(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
-    user = crud.authenticate(session=db, email=email, password=password)
+    user = await crud.authenticate(session=db, email=email, password=password)
     assert user is None
 
 
-def test_check_if_user_is_active(db: Session) -> None:
+async def test_check_if_user_is_active(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=email, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     assert user.is_active is True
 
 
-def test_check_if_user_is_active_inactive(db: Session) -> None:
+async def test_check_if_user_is_active_inactive(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=email, password=password, disabled=True)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     assert user.is_active
 
 
-def test_check_if_user_is_superuser(db: Session) -> None:
+async def test_check_if_user_is_superuser(db: AsyncSession) -> None:
     email = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=email, password=password, is_superuser=True)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     assert user.is_superuser is True
 
 
-def test_check_if_user_is_superuser_normal_user(db: Session) -> None:
+async def test_check_if_user_is_superuser_normal_user(db: AsyncSession) -> None:
     username = random_email()
     password = random_lower_string()
     user_in = UserCreate(email=username, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     assert user.is_superuser is False
 
 
-def test_get_user(db: Session) -> None:
+async def test_get_user(db: AsyncSession) -> None:
     password = random_lower_string()
     username = random_email()
     user_in = UserCreate(email=username, password=password, is_superuser=True)
-    user = crud.create_user(session=db, user_create=user_in)
-    user_2 = db.get(User, user.id)
+    user = await crud.create_user(session=db, user_create=user_in)
+    user_2 = await db.get(User, user.id)
     assert user_2
     assert user.email == user_2.email
     assert jsonable_encoder(user) == jsonable_encoder(user_2)
 
 
-def test_update_user(db: Session) -> None:
+async def test_update_user(db: AsyncSession) -> None:
     password = random_lower_string()
     email = random_email()
     user_in = UserCreate(email=email, password=password, is_superuser=True)
-    user = crud.create_user(session=db, user_create=user_in)
+    user = await crud.create_user(session=db, user_create=user_in)
     new_password = random_lower_string()
     user_in_update = UserUpdate(password=new_password, is_superuser=True)
     if user.id is not None:
-        crud.update_user(session=db, db_user=user, user_in=user_in_update)
-    user_2 = db.get(User, user.id)
+        await crud.update_user(session=db, db_user=user, user_in=user_in_update)
+    user_2 = await db.get(User, user.id)
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+async def test_user_email_exists(db: AsyncSession) -> None:
+    email = random_email()
+    assert not await crud.user_email_exists(session=db, email=email)
+    user_in = UserCreate(email=email, password=random_lower_string())
+    user = await crud.create_user(session=db, user_create=user_in)
+    assert await crud.user_email_exists(session=db, email=email)
+    assert not await crud.user_email_exists(
+        session=db, email=email, exclude_user_id=user.id
+    )
+
+
+async def test_authenticate_user_cache_hit(
+    db: AsyncSession, redis_cache: FakeRedis
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password, is_superuser=True)
+    user = await crud.create_user(session=db, user_create=user_in)
+    assert await crud.authenticate(session=db, email=email, password=password)
+    assert any(key.startswith("entity:User:") for key in redis_cache.data)
+    cached_user = await crud.authenticate(session=db, email=email, password=password)
+    assert cached_user
+    assert cached_user is not user
+    assert isinstance(cached_user.id, uuid.UUID)
+    assert cached_user.id == user.id
+    assert cached_user.is_superuser
+    assert cached_user.hashed_password == user.hashed_password
+
+
+@pytest.mark.usefixtures("redis_cache")
+async def test_authenticate_user_cached_after_password_change(
+    db: AsyncSession,
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = await crud.create_user(session=db, user_create=user_in)
+    assert await crud.authenticate(session=db, email=email, password=password)
+    # A login that read the row before the change and caches it afterwards
+    generation = await cache.get_generation(User)
+    stale_key = cache.entity_key(User, email, generation)
+    stale_user = user.model_dump_json()
+    new_password = random_lower_string()
+    user_in_update = UserUpdate(password=new_password)
+    await crud.update_user(session=db, db_user=user, user_in=user_in_update)
+    await cache.set_value(stale_key, stale_user)
+    assert not await crud.authenticate(session=db, email=email, password=password)
+    assert await crud.authenticate(session=db, email=email, password=new_password)
+
+
+async def test_authenticate_user_cached_after_failed_generation_bump(
+    db: AsyncSession, redis_cache: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = await crud.create_user(session=db, user_create=user_in)
+    assert await crud.authenticate(session=db, email=email, password=password)
+
+    async def fail_incr(_key: str) -> int:
+        raise ConnectionError("Error connecting to redis")
+
+    monkeypatch.setattr(redis_cache, "incr", fail_incr)
+    new_password = random_lower_string()
+    user_in_update = UserUpdate(password=new_password)
+    await crud.update_user(session=db, db_user=user, user_in=user_in_update)
+    assert not await crud.authenticate(session=db, email=email, password=password)
+    assert await crud.authenticate(session=db, email=email, password=new_password)
+
+
+async def test_update_user_fails_closed_without_redis(
+    db: AsyncSession, redis_cache: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = await crud.create_user(session=db, user_create=user_in)
+    assert await crud.authenticate(session=db, email=email, password=password)
+    assert redis_cache.data
+    monkeypatch.setattr(cache, "redis_client", UnreachableRedis())
+    user_in_update = UserUpdate(password=random_lower_string())
+    with pytest.raises(cache.CacheUnavailableError):
+        await crud.update_user(session=db, db_user=user, user_in=user_in_update)
@@ -1,25 +1,29 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from sqlmodel import select
+import pytest
 
 from app.backend_pre_start import init, logger
 
+pytestmark = pytest.mark.anyio
 
-def test_init_successful_connection() -> None:
+
+async def test_init_successful_connection() -> None:
     engine_mock = MagicMock()
 
     session_mock = MagicMock()
-    exec_mock = MagicMock(return_value=True)
-    session_mock.configure_mock(**{"exec.return_value": exec_mock})
+    exec_mock = AsyncMock(return_value=True)
+    session_mock.configure_mock(**{"exec": exec_mock})
+    session_factory_mock = MagicMock()
+    session_factory_mock.return_value.__aenter__.return_value = session_mock
 
     with (
-        patch("sqlmodel.Session", return_value=session_mock),
+        patch("app.backend_pre_start.AsyncSession", session_factory_mock),
         patch.object(logger, "info"),
         patch.object(logger, "error"),
         patch.object(logger, "warn"),
     ):
         try:
-            init(engine_mock)
+            await init(engine_mock)
             connection_successful = True
         except Exception:
             connection_successful = False
@@ -28,6 +32,6 @@ def test_init_successful_connection() -> None:
             connection_successful
         ), "The database connection should be successful and not raise an exception."
 
-        assert session_mock.exec.called_once_with(
-            select(1)
+        assert (
+            session_mock.exec.await_count == 1
         ), "The session should execute a select statement once."
@@ -0,0 +1,38 @@
+from typing import Any
+
+from redis.exceptions import ConnectionError
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands used by app.core.cache."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str | bytes, ex: int | None = None) -> bool:
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class UnreachableRedis:
+    """Redis client whose every command fails, as when the server is down."""
+
+    def __getattr__(self, name: str) -> Any:
+        async def fail(*_args: Any, **_kwargs: Any) -> Any:
+            raise ConnectionError("Error connecting to redis")
+
+        return fail